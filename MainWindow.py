@@ -48,10 +48,8 @@ class Ui_MainWindow(object):
         self.sortOrderSelect.setObjectName("sortOrderSelect")
         self.horizontalLayout.addWidget(self.sortOrderSelect)
         self.verticalLayout.addLayout(self.horizontalLayout)
-        self.tableView = QtWidgets.QTableWidget(self.verticalLayoutWidget)
+        self.tableView = QtWidgets.QTableView(self.verticalLayoutWidget)
         self.tableView.setObjectName("tableView")
-        self.tableView.setColumnCount(0)
-        self.tableView.setRowCount(0)
         self.verticalLayout.addWidget(self.tableView)
         self.sqlView = QtWidgets.QTextEdit(self.verticalLayoutWidget)
         self.sqlView.setObjectName("sqlView")
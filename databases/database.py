@@ -1,6 +1,6 @@
 import sqlite3
 from enum import Enum
-from typing import List, Any, Tuple
+from typing import List, Any, Tuple, Iterator
 
 
 class Resolver:
@@ -20,18 +20,21 @@ class QueryOp(Enum):
 
 
 class Query:
-    def __init__(self, table: "Table", op: QueryOp, param: Any, child: "Query" = None):
+    def __init__(self, table: "Table", op: QueryOp, param: Any, child: "Query" = None, params: Tuple[Any] = ()):
         """
         Initializes a query.\n
         :param table: The table the query should work on
         :param op: The operand
         :param param: The parameters for the query
         :param child: The child of the query
+        :param params: The values for the placeholders in param
         """
         self._table: "Table" = table
         self._op: QueryOp = op
         self._param: Any = param
         self._child: Query = child
+        self._params: Tuple[Any] = tuple(params)
+        self._sql: str = None
 
     @property
     def op(self) -> QueryOp:
@@ -49,20 +52,33 @@ class Query:
     def child(self) -> "Query":
         return self._child
 
-    def where(self, filters: str) -> "Query":
+    @property
+    def params(self) -> Tuple[Any]:
+        """
+        The placeholder values of the query and its children, in the order they appear in the sql command.\n
+        """
+        if self._child is None:
+            return self._params
+        return self._child.params + self._params
+
+    def where(self, filters: str, params: Tuple[Any] = ()) -> "Query":
         """
         Creates a query with QueryOp = WHERE and appends itself as the child\n
         :param filters: The filters to filter for. Dicts are linked with or, items in dict are linked with and.
+        :param params: The values for the '?' placeholders in filters
         :return: The where query
         """
-        return Query(self._table, QueryOp.WHERE, filters, self)
+        return Query(self._table, QueryOp.WHERE, filters, self, params)
 
     def resolve(self) -> str:
         """
         Resolves the query with the resolver on the database\n
+        The result is cached, as queries are not changed after creation.\n
         :return: The sql command as a string
         """
-        return self._table.database.resolver.resolve(self)
+        if self._sql is None:
+            self._sql = self._table.database.resolver.resolve(self)
+        return self._sql
 
 
 class Table:
@@ -145,6 +161,21 @@ class Database:
         """
         raise NotImplementedError()
 
+    def close(self):
+        """
+        Closes all open connections to the database.\n
+        Has to be implemented by concrete tables.\n
+        """
+        raise NotImplementedError()
+
+    def interrupt(self):
+        """
+        Aborts the sql commands that are currently running, they fail with an error.\n
+        Can be called from any thread.\n
+        Has to be implemented by concrete tables.\n
+        """
+        raise NotImplementedError()
+
     def fetch(self, sql: str, params: Tuple[Any]) -> List[Any]:
         """
         Fetches results for a sql command\n
@@ -155,6 +186,17 @@ class Database:
         """
         raise NotImplementedError()
 
+    def fetch_iter(self, sql: str, params: Tuple[Any], batch: int = 1000) -> Tuple[List[str], Iterator[List[Any]]]:
+        """
+        Fetches results for a sql command in batches\n
+        Has to be implemented by concrete tables.\n
+        :param sql: The sql command
+        :param params: The params
+        :param batch: The maximum number of rows per batch
+        :return: The column names of the result and an iterator over the batches
+        """
+        raise NotImplementedError()
+
     def execute(self, sql: str, params: Tuple[Any]):
         """
         Executes a sql command\n
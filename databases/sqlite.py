@@ -1,8 +1,15 @@
+import re
 import sqlite3
-from typing import List, Any, Tuple
+import threading
+from contextlib import closing
+from typing import List, Any, Tuple, Optional, Iterator, Dict
 
 from databases import Database, Table, Query, QueryOp, Resolver
 
+# Statements that change the schema, leading comments are skipped.
+_SCHEMA_CHANGE_RE = re.compile(r"\s*(?:(?:--[^\n]*\n|/\*.*?\*/)\s*)*(?:CREATE|DROP|ALTER)\b",
+                               re.IGNORECASE | re.DOTALL)
+
 
 class SqliteResolver(Resolver):
     def resolve(self, query: "Query") -> str:
@@ -30,16 +37,23 @@ class SqliteResolver(Resolver):
 
 class SqliteTable(Table):
     def get_columns(self) -> List[str]:
-        sql = f"PRAGMA table_info({self.name})"
-        columns = self.database.fetch(sql, ())
-        return list(map(lambda c: c[1], columns))
+        return self.database.get_table_columns(self.name)
 
 
 class SqliteDatabase(Database):
     def __init__(self, path: str):
         self._path: str = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._closed: bool = False
+        # The connection is shared with worker threads, calls into it have to be serialized.
+        self._lock: threading.RLock = threading.RLock()
+        self._tables_cache: Optional[List[str]] = None
+        self._columns_cache: Dict[str, List[str]] = {}
         resolver = SqliteResolver()
         super().__init__(resolver)
+        # The journal mode is persisted in the database file, so it only has to be set once.
+        with closing(sqlite3.connect(self._path)) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
 
     def __getitem__(self, item) -> Table:
         """
@@ -56,18 +70,90 @@ class SqliteDatabase(Database):
     def get_tables(self) -> List[str]:
         """
         Returns all tables of the database.\n
+        The result is cached until invalidate_schema is called.\n
         :return: The table names
         """
-        sql = "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'"
-        tables = self.fetch(sql, ())
-        return list(map(lambda t: t[0], tables))
+        tables = self._tables_cache
+        if tables is None:
+            sql = "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'"
+            tables = list(map(lambda t: t[0], self.fetch(sql, ())))
+            self._tables_cache = tables
+        return tables
+
+    def get_table_columns(self, table: str) -> List[str]:
+        """
+        Returns all columns of a table.\n
+        The result is cached until invalidate_schema is called.\n
+        :param table: The table name
+        :return: The column names
+        """
+        columns = self._columns_cache.get(table)
+        if columns is None:
+            sql = f"PRAGMA table_info({table})"
+            columns = list(map(lambda c: c[1], self.fetch(sql, ())))
+            self._columns_cache[table] = columns
+        return columns
+
+    def invalidate_schema(self):
+        """
+        Drops the cached tables and columns.\n
+        Called automatically for CREATE, DROP and ALTER statements run through this database.\n
+        """
+        self._tables_cache = None
+        self._columns_cache.clear()
 
     def connect(self) -> sqlite3.Connection:
         """
         Creates a sqlite connection to the database.\n
         :return: The connection
         """
-        return sqlite3.connect(self._path)
+        conn = sqlite3.connect(self._path, isolation_level=None, check_same_thread=False,
+                               cached_statements=256)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA cache_size=-10000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def close(self):
+        """
+        Closes the cached connection, if there is one.\n
+        Running commands are interrupted, the database can not be used afterwards.\n
+        """
+        self._closed = True
+        self.interrupt()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def interrupt(self):
+        """
+        Aborts the sql commands that are currently running, they fail with an OperationalError.\n
+        Does not take the lock, so it can be called while another thread is running a command.\n
+        """
+        conn = self._conn
+        if conn is not None:
+            conn.interrupt()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """
+        Returns the cached connection and creates it on first use.\n
+        Reusing one connection keeps sqlite's page cache warm between queries.\n
+        :return: The connection
+        """
+        if self._closed:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        if self._conn is None:
+            self._conn = self.connect()
+        return self._conn
+
+    def optimize(self):
+        """
+        Lets sqlite update the statistics of the query planner.\n
+        Should be called periodically on long running sessions.\n
+        """
+        self.execute("PRAGMA optimize", ())
 
     def execute(self, sql: str, params: Tuple[Any]):
         """
@@ -75,10 +161,12 @@ class SqliteDatabase(Database):
         :param sql: The sql command
         :param params: The params
         """
-        with self.connect() as conn:
+        with self._lock:
+            conn = self._get_connection()
             c = conn.cursor()
             c.execute(sql, params)
             conn.commit()
+        self._invalidate_schema_on_change(sql)
 
     def fetch(self, sql: str, params: Tuple[Any]) -> List[Any]:
         """
@@ -87,7 +175,43 @@ class SqliteDatabase(Database):
         :param params: The params
         :return: The results
         """
-        with self.connect() as conn:
-            c = conn.cursor()
+        with self._lock:
+            c = self._get_connection().cursor()
+            c.execute(sql, params)
+            rows = c.fetchall()
+        self._invalidate_schema_on_change(sql)
+        return rows
+
+    def fetch_iter(self, sql: str, params: Tuple[Any], batch: int = 1000) -> Tuple[List[str], Iterator[List[Any]]]:
+        """
+        Fetches results for a sql command in batches\n
+        The command is executed right away, the rows are fetched while iterating.\n
+        :param sql: The sql command
+        :param params: The params
+        :param batch: The maximum number of rows per batch
+        :return: The column names of the result and an iterator over the batches
+        """
+        with self._lock:
+            c = self._get_connection().cursor()
+            c.arraysize = batch
             c.execute(sql, params)
-            return c.fetchall()
+        self._invalidate_schema_on_change(sql)
+        columns = [d[0] for d in c.description] if c.description is not None else []
+        return columns, self._iter_batches(c)
+
+    def _invalidate_schema_on_change(self, sql: str):
+        if _SCHEMA_CHANGE_RE.match(sql):
+            self.invalidate_schema()
+
+    def _iter_batches(self, cursor: sqlite3.Cursor) -> Iterator[List[Any]]:
+        # The cursor is closed when the iterator is closed early, so its statement does not stay active.
+        try:
+            while True:
+                with self._lock:
+                    rows = cursor.fetchmany()
+                if not rows:
+                    return
+                yield rows
+        finally:
+            with self._lock:
+                cursor.close()
@@ -1,33 +1,34 @@
 # pyuic6 MainWindow.ui -o MainWindow.py
 import sys
 
-from PyQt6 import QtWidgets
+from PyQt6 import QtCore, QtWidgets
 
-from MainWindow import Ui_MainWindow
 from databases import SqliteDatabase
 from viewer import Viewer
 
 
-class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
-    def __init__(self, *args, obj=None, **kwargs):
-        super(MainWindow, self).__init__(*args, **kwargs)
-        self.setupUi(self)
+if __name__ == "__main__":
+    from MainWindow import Ui_MainWindow
 
+    class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
+        def __init__(self, *args, obj=None, **kwargs):
+            super(MainWindow, self).__init__(*args, **kwargs)
+            self.setupUi(self)
 
-app = QtWidgets.QApplication(sys.argv)
+    app = QtWidgets.QApplication(sys.argv)
 
-window = MainWindow()
+    window = MainWindow()
 
-db = SqliteDatabase("db.db")
+    db = SqliteDatabase("db.db")
 
-table_widget: QtWidgets.QTableWidget = window.findChild(QtWidgets.QTableWidget, "tableView")
-sql_widget: QtWidgets.QTextEdit = window.findChild(QtWidgets.QTextEdit, "sqlView")
-errors_widget: QtWidgets.QLineEdit = window.findChild(QtWidgets.QLineEdit, "errorsView")
-table_select_widget: QtWidgets.QComboBox = window.findChild(QtWidgets.QComboBox, "tableSelect")
-filter_input_widget: QtWidgets.QLineEdit = window.findChild(QtWidgets.QLineEdit, "filterInput")
+    optimize_timer = QtCore.QTimer()
+    optimize_timer.timeout.connect(db.optimize)
+    optimize_timer.start(15 * 60 * 1000)
 
-viewer = Viewer(db, table_widget, sql_widget, errors_widget, table_select_widget, filter_input_widget)
-
-window.show()
-app.exec()
+    viewer = Viewer(db, window.tableView, window.sqlView, window.errorsView, window.tableSelect, window.filterInput)
+    app.aboutToQuit.connect(optimize_timer.stop)
+    app.aboutToQuit.connect(viewer.close)
+    app.aboutToQuit.connect(db.close)
 
+    window.show()
+    app.exec()
@@ -1,25 +1,77 @@
-from typing import List
+import re
+from typing import Tuple, Any
 
+# Comments, blob and string literals, quoted identifiers, type names with a size, clause keywords,
+# placeholders and numeric literals.
+_TOKEN_RE = re.compile(r"""
+    (?P<comment>--[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<blob>(?<!\w)[xX]'[^']*')
+  | (?P<string>'(?:[^']|'')*')
+  | (?P<identifier>"(?:[^"]|"")*"|\[[^\]]*\]|`[^`]*`)
+  | (?P<type>\bAS\s+\w+\s*\([^)]*\))
+  | (?P<clause>\b(?:(?:ORDER|GROUP)\s+BY|LIMIT|OFFSET|WHERE|HAVING)\b)
+  | (?P<placeholder>\?)
+  | (?P<number>(?<![\w.])\d+(?:\.\d+)?(?![\w.]))
+""", re.IGNORECASE | re.VERBOSE | re.DOTALL)
+# Clauses whose numbers are column indexes or row counts instead of values.
+_LITERAL_CLAUSES = ("ORDER", "GROUP", "LIMIT", "OFFSET")
+_MAX_INTEGER = 2 ** 63 - 1
 
-def get_selected_columns(sql: str) -> List[str]:
+
+def parameterize(sql: str) -> Tuple[str, Tuple[Any]]:
     """
-    Gets the selected columns for a select command.\n
-    :param sql: The command
-    :return: The selected columns
+    Replaces the string and number literals in value positions of a sql fragment with '?' placeholders.\n
+    Fragments that only differ in their literals resolve to the same sql and can reuse a prepared statement.\n
+    Literals after ORDER BY, GROUP BY, LIMIT and OFFSET, in type names, comments and blob literals are kept.\n
+    If the fragment already has placeholders or a literal can not be bound, it is returned unchanged.\n
+    :param sql: The sql fragment
+    :return: The fragment with placeholders and the extracted params
     """
-    sql = sql.lower()
-    if "select" not in sql:
-        raise ValueError("Not a select command.")
-    select_index = sql.find("select") + 6
-    sql = sql[select_index:].strip()
-    splitted = sql.split(",")
-    splitted = [c.strip() for c in splitted]
-    columns = []
-    for entry in splitted:
-        if " " in entry:
-            columns.append(entry.split(" ")[0])
-            break
+    parts = []
+    params = []
+    position = 0
+    bind = True
+    for match in _TOKEN_RE.finditer(sql):
+        kind = match.lastgroup
+        token = match.group(0)
+        if kind == "placeholder":
+            return sql, ()
+        if kind == "clause":
+            bind = token.split()[0].upper() not in _LITERAL_CLAUSES
+            continue
+        if not bind or kind not in ("string", "number"):
+            continue
+        if kind == "string":
+            params.append(token[1:-1].replace("''", "'"))
+        elif "." in token:
+            params.append(float(token))
+        elif int(token) > _MAX_INTEGER:
+            return sql, ()
         else:
-            columns.append(entry)
-    return columns
+            params.append(int(token))
+        parts.append(sql[position:match.start()])
+        parts.append("?")
+        position = match.end()
+    parts.append(sql[position:])
+    return "".join(parts), tuple(params)
+
+
+def inline_params(sql: str, params: Tuple[Any]) -> str:
+    """
+    Replaces the '?' placeholders of a sql command with the literals of the given params.\n
+    :param sql: The sql command
+    :param params: The params
+    :return: The sql command without placeholders
+    """
+    remaining = list(reversed(params))
+
+    def replace(match: re.Match) -> str:
+        token = match.group(0)
+        if match.lastgroup != "placeholder" or not remaining:
+            return token
+        value = remaining.pop()
+        if isinstance(value, str):
+            return "'" + value.replace("'", "''") + "'"
+        return str(value)
 
+    return _TOKEN_RE.sub(replace, sql)
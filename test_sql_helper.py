@@ -0,0 +1,76 @@
+import sqlite3
+import unittest
+
+import sql_helper
+
+
+class ParameterizeTest(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute("CREATE TABLE t (id integer, name text)")
+        self.conn.executemany("INSERT INTO t VALUES (?, ?)", [(1, "a"), (2, "b"), (2, "it's")])
+
+    def tearDown(self):
+        self.conn.close()
+
+    def assertSameResult(self, filters: str):
+        sql = "SELECT * FROM t WHERE "
+        fragment, params = sql_helper.parameterize(filters)
+        expected = self.conn.execute(sql + filters).fetchall()
+        self.assertEqual(expected, self.conn.execute(sql + fragment, params).fetchall())
+
+    def test_binds_values(self):
+        self.assertEqual(("id = ? AND name = ?", (2, "it's")), sql_helper.parameterize("id = 2 AND name = 'it''s'"))
+        self.assertEqual(("id IN (?,?) OR id > ?", (1, 2, 1.5)), sql_helper.parameterize("id IN (1,2) OR id > 1.5"))
+
+    def test_keeps_identifiers(self):
+        self.assertEqual(('"id 1" = ? AND a1 = 1e5', (2,)), sql_helper.parameterize('"id 1" = 2 AND a1 = 1e5'))
+
+    def test_keeps_order_and_group_by(self):
+        self.assertEqual(("?=? ORDER BY 1 DESC", (1, 1)), sql_helper.parameterize("1=1 ORDER BY 1 DESC"))
+        self.assertSameResult("1=1 ORDER BY 1 DESC")
+        self.assertSameResult("id > 0 GROUP BY 1")
+        self.assertSameResult("id > 0 GROUP BY id HAVING count(*) > 1")
+        self.assertSameResult("id > 0 LIMIT 1 OFFSET 1")
+
+    def test_keeps_type_names(self):
+        self.assertEqual(("CAST(id AS VARCHAR(10)) = ?", ("1",)),
+                         sql_helper.parameterize("CAST(id AS VARCHAR(10)) = '1'"))
+        self.assertSameResult("CAST(id AS VARCHAR(10)) = '1'")
+
+    def test_keeps_blob_literals(self):
+        self.assertEqual(("name = x'61'", ()), sql_helper.parameterize("name = x'61'"))
+        self.assertSameResult("name = x'61'")
+
+    def test_keeps_comments(self):
+        self.assertEqual(("id = ? /* 'a' */", (1,)), sql_helper.parameterize("id = 1 /* 'a' */"))
+        self.assertEqual(("id = ? -- 'x'", (1,)), sql_helper.parameterize("id = 1 -- 'x'"))
+        self.assertSameResult("id = 1 /* 'a' 2 ? */")
+        self.assertSameResult("id = 1 -- it's 2 ?")
+        self.assertSameResult("id = 1 -- it's\nOR name = 'b'")
+        self.assertSameResult("id = 1 /* ORDER BY */ OR id = 2")
+
+    def test_falls_back_on_large_integers(self):
+        filters = "id = 99999999999999999999"
+        self.assertEqual((filters, ()), sql_helper.parameterize(filters))
+        self.assertSameResult(filters)
+
+    def test_falls_back_on_placeholders(self):
+        self.assertEqual(("id = ? OR id = 1", ()), sql_helper.parameterize("id = ? OR id = 1"))
+
+
+class InlineParamsTest(unittest.TestCase):
+    def test_round_trip(self):
+        for filters in ["id = 2 AND name = 'it''s'", "CAST(id AS VARCHAR(10)) = '1' ORDER BY 1", "name = x'61'",
+                        "id = 1 /* 'a' ? */ -- it's ?"]:
+            self.assertEqual(filters, sql_helper.inline_params(*sql_helper.parameterize(filters)))
+
+    def test_inlines_in_order(self):
+        self.assertEqual("id = 2 AND name = 'it''s'", sql_helper.inline_params("id = ? AND name = ?", (2, "it's")))
+
+    def test_keeps_placeholders_without_params(self):
+        self.assertEqual("id = 1 OR id = ?", sql_helper.inline_params("id = ? OR id = ?", (1,)))
+
+
+if __name__ == "__main__":
+    unittest.main()
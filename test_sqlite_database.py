@@ -0,0 +1,82 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from databases import SqliteDatabase
+
+
+class SqliteDatabaseTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.database = SqliteDatabase(os.path.join(self.directory.name, "test.db"))
+        self.database.execute("CREATE TABLE dogs (name text, age integer)", ())
+        self.database.execute("INSERT INTO dogs VALUES (?, ?)", ("Mambo", 11))
+
+    def tearDown(self):
+        self.database.close()
+        self.directory.cleanup()
+
+    def test_caches_tables(self):
+        tables = self.database.get_tables()
+        self.assertEqual(["dogs"], tables)
+        self.assertIs(tables, self.database.get_tables())
+
+    def test_caches_columns(self):
+        columns = self.database.get_table_columns("dogs")
+        self.assertEqual(["name", "age"], columns)
+        self.assertIs(columns, self.database.get_table_columns("dogs"))
+        self.assertIs(columns, self.database["dogs"].get_columns())
+
+    def test_invalidates_on_create_and_drop(self):
+        self.database.get_tables()
+        self.database.execute("CREATE TABLE cats (name text)", ())
+        self.assertEqual(["dogs", "cats"], self.database.get_tables())
+        self.database.fetch("DROP TABLE cats", ())
+        self.assertEqual(["dogs"], self.database.get_tables())
+
+    def test_invalidates_on_alter(self):
+        self.database.get_table_columns("dogs")
+        columns, batches = self.database.fetch_iter("ALTER TABLE dogs ADD COLUMN owner text", ())
+        list(batches)
+        self.assertEqual(["name", "age", "owner"], self.database.get_table_columns("dogs"))
+
+    def test_invalidates_after_leading_comments(self):
+        self.database.get_tables()
+        self.database.execute("-- cats\nCREATE TABLE cats (name text)", ())
+        self.assertEqual(["dogs", "cats"], self.database.get_tables())
+        self.database.execute("/* no more\ncats */ drop table cats", ())
+        self.assertEqual(["dogs"], self.database.get_tables())
+
+    def test_keeps_cache_for_other_statements(self):
+        tables = self.database.get_tables()
+        columns = self.database.get_table_columns("dogs")
+        self.database.optimize()
+        self.database.fetch("SELECT * FROM dogs", ())
+        self.database.execute("INSERT INTO dogs VALUES (?, ?)", ("Herbert", 8))
+        self.database.fetch("-- CREATE TABLE cats (name text)\nSELECT 1", ())
+        self.assertIs(tables, self.database.get_tables())
+        self.assertIs(columns, self.database.get_table_columns("dogs"))
+
+    def test_fetch_iter_returns_result_columns(self):
+        columns, batches = self.database.fetch_iter("SELECT name AS n, age + 1 FROM dogs", ())
+        self.assertEqual(["n", "age + 1"], columns)
+        self.assertEqual([[("Mambo", 12)]], list(batches))
+
+    def test_fetch_iter_without_result(self):
+        columns, batches = self.database.fetch_iter("UPDATE dogs SET age = age + 1", ())
+        self.assertEqual([], columns)
+        self.assertEqual([], list(batches))
+
+    def test_close_interrupts_and_does_not_reconnect(self):
+        columns, batches = self.database.fetch_iter("SELECT * FROM dogs", (), 1)
+        self.database.close()
+        with self.assertRaises(sqlite3.ProgrammingError):
+            list(batches)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            self.database.fetch("SELECT * FROM dogs", ())
+        self.database.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,15 +1,23 @@
-from typing import List, Tuple, Callable
+import functools
+from typing import List, Tuple, Callable, Any
 
-from PyQt6 import QtWidgets
+from PyQt6 import QtCore, QtWidgets
 
 import sql_helper
 from databases import Database, Query
 
+# Milliseconds to wait after the last keystroke before a query is run.
+DEBOUNCE_INTERVAL = 150
+# Number of rows that are fetched and added to the table at once.
+FETCH_BATCH_SIZE = 1000
+# Maximum number of rows that are shown for a single query.
+MAX_ROWS = 100000
+
 
 class Viewer:
     def __init__(self,
                  database: Database,
-                 table_widget: QtWidgets.QTableWidget,
+                 table_widget: QtWidgets.QTableView,
                  sql_widget: QtWidgets.QTextEdit,
                  errors_widget: QtWidgets.QLineEdit,
                  table_select_widget: QtWidgets.QComboBox,
@@ -25,6 +33,20 @@ class Viewer:
         self._table: str = ""
         self._selection: str or List[str] = "*"
         self._filter: str = None
+        self._generation: int = 0
+        self._last_query: Tuple[str, Tuple[Any]] = None
+        self._pending_view: Tuple[str, Tuple[Any], bool] = None
+
+        # A single worker, a superseded fetch is interrupted so the next one can start right away.
+        self._thread_pool: QtCore.QThreadPool = QtCore.QThreadPool()
+        self._thread_pool.setMaxThreadCount(1)
+        self._fetch_signals: FetchSignals = FetchSignals()
+        self._fetch_signals.started.connect(self._on_fetch_started)
+        self._fetch_signals.batch.connect(self._on_fetch_batch)
+        self._fetch_signals.truncated.connect(self._on_fetch_truncated)
+        self._fetch_signals.failed.connect(self._on_fetch_failed)
+        self._resolve_cached: Callable[[str, Any, str], Tuple[str, Tuple[Any]]] = \
+            functools.lru_cache(maxsize=128)(self._resolve)
 
         self._database: Database = database
         self._table_view: TableView = TableView(table_widget)
@@ -35,33 +57,80 @@ class Viewer:
 
         self._table_select.set_tables(database.get_tables())
 
-    def build_query(self) -> Query:
+    def resolve_query(self) -> Tuple[str, Tuple[Any]]:
         """
-        Build the query.\n
+        Resolves the current query. Results are memoized on table, selection and filter.\n
+        :return: The sql command and its params
         """
-        table = self._database[self._table]
-        query = table.select(self._selection)
-        if self._filter is not None:
-            query = query.where(self._filter)
+        selection = self._selection if isinstance(self._selection, str) else tuple(self._selection)
+        return self._resolve_cached(self._table, selection, self._filter)
+
+    def _build_query(self, table_name: str, selection: str or List[str], filters: str) -> Query:
+        table = self._database[table_name]
+        # A literal '*' saves the column lookup, the header is taken from the result.
+        query = table.select(["*"] if selection == "*" else list(selection))
+        if filters is not None:
+            query = query.where(*sql_helper.parameterize(filters))
         return query
 
-    def update_view(self, sql: str, set_sql: bool = True):
+    def _resolve(self, table_name: str, selection: str or Tuple[str], filters: str) -> Tuple[str, Tuple[Any]]:
+        query = self._build_query(table_name, selection, filters)
+        return query.resolve(), query.params
+
+    def update_view(self, sql: str, params: Tuple[Any] = (), set_sql: bool = True):
         """
         Update the view.\n
+        The rows are fetched on a worker thread, the view is updated as soon as they arrive.\n
         :param sql: The sql command
+        :param params: The values for the placeholders in the sql command
         :param set_sql: Should the sql view be set?
         """
-        try:
-            data = self._database.fetch(sql, ())
-        except Exception as error:
-            self._errors_layout.set(str(error))
+        if (sql, params) == self._last_query:
+            return
+        self._last_query = (sql, params)
+        self._generation += 1
+        self._pending_view = (sql, params, set_sql)
+        generation = self._generation
+        self._thread_pool.clear()
+        self._database.interrupt()
+        self._thread_pool.start(FetchTask(self._database, sql, params, generation, self._fetch_signals,
+                                          lambda: generation != self._generation))
+
+    def close(self):
+        """
+        Cancels the running fetch and waits for the worker to finish.\n
+        Has to be called before the database is closed.\n
+        """
+        self._generation += 1
+        self._thread_pool.clear()
+        self._database.interrupt()
+        self._thread_pool.waitForDone()
+
+    def _on_fetch_started(self, generation: int, columns: List[str], data: List[Tuple]):
+        if generation != self._generation:
             return
-        columns = sql_helper.get_selected_columns(sql)
+        sql, params, set_sql = self._pending_view
         self._table_view.set_columns(columns)
         self._table_view.set_data(data)
         self._errors_layout.clear()
         if set_sql:
-            self._sql_view.set_text(sql)
+            self._sql_view.set_text(sql_helper.inline_params(sql, params))
+
+    def _on_fetch_batch(self, generation: int, data: List[Tuple]):
+        if generation != self._generation:
+            return
+        self._table_view.append_rows(data)
+
+    def _on_fetch_truncated(self, generation: int):
+        if generation != self._generation:
+            return
+        self._errors_layout.set(f"Only the first {MAX_ROWS} rows are shown.")
+
+    def _on_fetch_failed(self, generation: int, error: str):
+        if generation != self._generation:
+            return
+        self._last_query = None
+        self._errors_layout.set(error)
 
     def init_table(self, table_name: str):
         """
@@ -72,20 +141,95 @@ class Viewer:
         self._selection = "*"
         self._filter = None
         self._filter_input.clear()
-        sql = self.build_query().resolve()
-        self.update_view(sql)
+        sql, params = self.resolve_query()
+        self.update_view(sql, params)
 
     def update_sql(self, sql: str):
         """
         Updates the table for a given sql command.\n
         :param sql: The sql command
         """
-        self.update_view(sql, False)
+        self.update_view(sql, set_sql=False)
 
     def _set_filter(self, filters: str):
         self._filter = filters
-        sql = self.build_query().resolve()
-        self.update_view(sql)
+        sql, params = self.resolve_query()
+        self.update_view(sql, params)
+
+
+def format_rows(rows: List[Tuple]) -> List[Tuple[str]]:
+    """
+    Converts all cells of the given rows to their display text.\n
+    Done on the fetch worker, so the table model does not have to convert cells while painting.\n
+    :param rows: The rows
+    :return: The formatted rows
+    """
+    return [tuple(map(str, row)) for row in rows]
+
+
+class FetchSignals(QtCore.QObject):
+    """
+    Signals of a fetch task, all carrying the generation of the view update they belong to.\n
+    started: The column names and the first batch of rows (possibly empty)\n
+    batch: Any further batch of rows\n
+    truncated: The result has more than MAX_ROWS rows, only the first MAX_ROWS were sent\n
+    failed: The error message
+    """
+    started = QtCore.pyqtSignal(int, list, list)
+    batch = QtCore.pyqtSignal(int, list)
+    truncated = QtCore.pyqtSignal(int)
+    failed = QtCore.pyqtSignal(int, str)
+
+
+class FetchTask(QtCore.QRunnable):
+    def __init__(self,
+                 database: Database,
+                 sql: str,
+                 params: Tuple[Any],
+                 generation: int,
+                 signals: FetchSignals,
+                 is_cancelled: Callable[[], bool]):
+        """
+        Initializes the fetch task.\n
+        :param database: The database object
+        :param sql: The sql command
+        :param params: The params
+        :param generation: The generation of the view update
+        :param signals: The signals to report the results with
+        :param is_cancelled: Returns whether the results are not needed anymore
+        """
+        super().__init__()
+        self._database: Database = database
+        self._sql: str = sql
+        self._params: Tuple[Any] = params
+        self._generation: int = generation
+        self._signals: FetchSignals = signals
+        self._is_cancelled: Callable[[], bool] = is_cancelled
+
+    def run(self):
+        if self._is_cancelled():
+            return
+        batches = None
+        try:
+            columns, batches = self._database.fetch_iter(self._sql, self._params, FETCH_BATCH_SIZE)
+            data = next(batches, [])
+            self._signals.started.emit(self._generation, columns, format_rows(data[:MAX_ROWS]))
+            loaded = len(data)
+            while loaded < MAX_ROWS and not self._is_cancelled():
+                data = next(batches, [])
+                if not data:
+                    break
+                self._signals.batch.emit(self._generation, format_rows(data[:MAX_ROWS - loaded]))
+                loaded += len(data)
+            if loaded > MAX_ROWS or (loaded == MAX_ROWS and next(batches, None) is not None):
+                self._signals.truncated.emit(self._generation)
+        except Exception as error:
+            # A superseded fetch is interrupted, the resulting error is expected.
+            if not self._is_cancelled():
+                self._signals.failed.emit(self._generation, str(error))
+        finally:
+            if batches is not None:
+                batches.close()
 
 
 class ErrorsView:
@@ -111,38 +255,125 @@ class ErrorsView:
         self._widget.setText("")
 
 
+class TableModel(QtCore.QAbstractTableModel):
+    def __init__(self, parent: QtCore.QObject = None):
+        """
+        Initializes the table model.\n
+        Cells that are not strings yet are converted when they are displayed.\n
+        :param parent: The parent object
+        """
+        super().__init__(parent)
+        self._columns: List[str] = []
+        self._rows: List[Tuple] = []
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def columnCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._columns)
+
+    def headerData(self, section: int, orientation: QtCore.Qt.Orientation,
+                   role: int = QtCore.Qt.ItemDataRole.DisplayRole) -> Any:
+        if role == QtCore.Qt.ItemDataRole.DisplayRole and orientation == QtCore.Qt.Orientation.Horizontal:
+            return self._columns[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.ItemDataRole.DisplayRole) -> Any:
+        if role != QtCore.Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        entry = self._rows[index.row()]
+        column = index.column()
+        if column >= len(entry):
+            return None
+        value = entry[column]
+        return value if type(value) is str else str(value)
+
+    def set_columns(self, columns: List[str]):
+        """
+        Sets the columns. Nothing is reset if the columns did not change.\n
+        :param columns: The column names
+        """
+        columns = list(columns)
+        if columns == self._columns:
+            return
+        self.beginResetModel()
+        self._columns = columns
+        self.endResetModel()
+
+    def set_rows(self, rows: List[Tuple]):
+        """
+        Sets the rows. The list is used as is and not copied.\n
+        :param rows: The rows
+        """
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+
+    def append_rows(self, rows: List[Tuple]):
+        """
+        Appends rows to the end of the table.\n
+        :param rows: The rows
+        """
+        if not rows:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+
+    def insert_row(self, row: int, entry: Tuple):
+        """
+        Inserts a row at a given index.\n
+        :param row: The row index
+        :param entry: The row
+        """
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self._rows.insert(row, entry)
+        self.endInsertRows()
+
+    def remove_row(self, row: int):
+        """
+        Removes a row from a given index.\n
+        :param row: The index
+        """
+        self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+        del self._rows[row]
+        self.endRemoveRows()
+
+
 class TableView:
-    def __init__(self, widget: QtWidgets.QTableWidget):
+    def __init__(self, widget: QtWidgets.QTableView):
         """
         Initializes the table view.\n
-        :param widget: The table widget
+        :param widget: The table view widget
         """
-        self._widget: QtWidgets.QTableWidget = widget
+        self._widget: QtWidgets.QTableView = widget
+        self._model: TableModel = TableModel(widget)
+        self._widget.setModel(self._model)
 
     def set_columns(self, columns: List[str]):
         """
         Sets the columns.\n
         :param columns: The column names
         """
-        self._widget.setColumnCount(len(columns))
-        self._widget.setHorizontalHeaderLabels(columns)
+        self._model.set_columns(columns)
 
     def set_data(self, data: List[Tuple]):
         """
         Sets the table data.\n
         :param data: The data
         """
-        self.clear()
-        for entry in data:
-            row_position = self._widget.rowCount()
-            self.insert_row(row_position, entry)
+        self._model.set_rows(data)
 
     def clear(self):
         """
         Removes all rows.\n
         """
-        for i in range(0, self._widget.rowCount()):
-            self._widget.removeRow(0)
+        self._model.set_rows([])
 
     def insert_row(self, row: int, entry: Tuple):
         """
@@ -150,28 +381,33 @@ class TableView:
         :param row: The row index
         :param entry: The row
         """
-        if row > self._widget.rowCount():
+        if row > self._model.rowCount():
             raise IndexError("Row index out of bounce.")
-        self._widget.insertRow(row)
-        for i in range(len(entry)):
-            self._widget.setItem(row, i, QtWidgets.QTableWidgetItem(str(entry[i])))
+        self._model.insert_row(row, entry)
 
     def append_row(self, entry: Tuple):
         """
         Appends a row to the table.\n
         :param entry: The row
         """
-        index = self._widget.rowCount()
+        index = self._model.rowCount()
         self.insert_row(index, entry)
 
+    def append_rows(self, entries: List[Tuple]):
+        """
+        Appends rows to the table.\n
+        :param entries: The rows
+        """
+        self._model.append_rows(entries)
+
     def remove_row(self, row: int):
         """
         Removes a row from a given index.\n
         :param row: The index
         """
-        if row > self._widget.rowCount():
+        if row >= self._model.rowCount():
             raise IndexError("Row index out of bounce.")
-        self._widget.removeRow(row)
+        self._model.remove_row(row)
 
 
 class SqlView:
@@ -184,15 +420,27 @@ class SqlView:
         self._widget: QtWidgets.QTextEdit = widget
         self._widget.textChanged.connect(self._on_text_changed)
         self._update_fn: Callable[[str], None] = update_fn
+        self._timer: QtCore.QTimer = QtCore.QTimer(widget)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(DEBOUNCE_INTERVAL)
+        self._timer.timeout.connect(self._on_timeout)
 
     def set_text(self, text: str):
         """
-        Set the text of the text edit
+        Set the text of the text edit without triggering the update function.\n
         :param text: The text
         """
-        self._widget.setPlainText(text)
+        self._timer.stop()
+        self._widget.blockSignals(True)
+        try:
+            self._widget.setPlainText(text)
+        finally:
+            self._widget.blockSignals(False)
 
     def _on_text_changed(self):
+        self._timer.start()
+
+    def _on_timeout(self):
         text = self._widget.toPlainText()
         self._update_fn(text)
 
@@ -214,18 +462,23 @@ class TableSelect:
 
     def set_tables(self, tables: List[str]):
         """
-        Sets the items of the select.\n
+        Sets the items of the select and selects the first table.\n
         :param tables: The table names
         """
-        self.clear()
-        self._widget.addItems(tables)
+        self._widget.blockSignals(True)
+        try:
+            self.clear()
+            self._widget.addItems(tables)
+        finally:
+            self._widget.blockSignals(False)
+        if tables:
+            self._on_select()
 
     def clear(self):
         """
         Clears the select.\n
         """
-        for i in range(0, self._widget.count()):
-            self._widget.removeItem(0)
+        self._widget.clear()
 
 
 class FilterInput:
@@ -238,9 +491,17 @@ class FilterInput:
         self._widget: QtWidgets.QLineEdit = widget
         self._update_fn: Callable[[str], None] = update_fn
         self._widget.textEdited.connect(self._on_text_changed)
+        self._timer: QtCore.QTimer = QtCore.QTimer(widget)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(DEBOUNCE_INTERVAL)
+        self._timer.timeout.connect(self._on_timeout)
 
     def _on_text_changed(self):
+        self._timer.start()
+
+    def _on_timeout(self):
         self._update_fn(self._widget.text())
 
     def clear(self):
+        self._timer.stop()
         self._widget.setText("")